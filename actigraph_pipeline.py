@@ -6,7 +6,34 @@ the Actigraph CentrePoint API into AWS Athena.
 """
 
 import dlt
-from actigraph_source import actigraph_source
+from functools import lru_cache
+from typing import NamedTuple
+
+from actigraph_source import actigraph_source, get_pipeline
+
+
+class ActigraphConfig(NamedTuple):
+    study_id: int
+    subject_id: int
+    from_date: str
+    to_date: str
+
+
+@lru_cache(maxsize=1)
+def read_config() -> ActigraphConfig:
+    """
+    Resolve the Actigraph source configuration once per process.
+
+    Each dlt.config.get call walks the full provider chain (env vars,
+    .toml files), so the four values are snapshotted together and cached.
+    """
+    section = "sources.actigraph_source.actigraph"
+    return ActigraphConfig(
+        study_id=dlt.config.get(f"{section}.study_id"),
+        subject_id=dlt.config.get(f"{section}.subject_id"),
+        from_date=dlt.config.get(f"{section}.from_date"),
+        to_date=dlt.config.get(f"{section}.to_date"),
+    )
 
 
 def main(refresh: bool = False):
@@ -20,25 +47,22 @@ def main(refresh: bool = False):
     """
     print("\n--- Starting Actigraph Data Pipeline ---")
     
-    # Create the DLT pipeline
+    # Create the DLT pipeline (cached across invocations in one process)
     # Using Snowflake destination to write to existing Iceberg table
-    pipeline = dlt.pipeline(
-        pipeline_name="actigraph_pipeline",
-        destination="snowflake",
-        dataset_name="SENSORCLOUD",  # Snowflake schema name
+    pipeline = get_pipeline(
+        "actigraph_pipeline",
+        "snowflake",
+        "SENSORCLOUD",  # Snowflake schema name
     )
     
     # Load configuration from .dlt/config.toml for display
     # DLT will automatically inject these values into the source function
-    study_id = dlt.config.get("sources.actigraph_source.actigraph.study_id")
-    subject_id = dlt.config.get("sources.actigraph_source.actigraph.subject_id")
-    from_date = dlt.config.get("sources.actigraph_source.actigraph.from_date")
-    to_date = dlt.config.get("sources.actigraph_source.actigraph.to_date")
-    
+    cfg = read_config()
+
     print(f"Configuration:")
-    print(f"  Study ID: {study_id}")
-    print(f"  Subject ID: {subject_id}")
-    print(f"  Date Range: {from_date} to {to_date}")
+    print(f"  Study ID: {cfg.study_id}")
+    print(f"  Subject ID: {cfg.subject_id}")
+    print(f"  Date Range: {cfg.from_date} to {cfg.to_date}")
     print(f"  Refresh Mode: {refresh}")
     
     # Create the source - refresh parameter is deprecated but kept for compatibility
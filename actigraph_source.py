@@ -5,25 +5,64 @@ This module provides a DLT source for ingesting data from the Actigraph CentrePo
 It implements OAuth2 client credentials authentication following DLT best practices.
 """
 
+import threading
+import time
+from functools import lru_cache
+
+import orjson
+
 import dlt
 from dlt.sources.helpers.rest_client.auth import AuthConfigBase
 from dlt.sources.rest_api import rest_api_source
 from dlt.common.typing import TSecretStrValue
 from dlt.common.configuration import configspec
 from requests.auth import AuthBase
+from requests.adapters import HTTPAdapter, Retry
 from requests import PreparedRequest, Session
-import requests
+
+# Refresh tokens slightly before they expire so in-flight requests never
+# carry a token that lapses mid-request.
+_TOKEN_EXPIRY_LEEWAY = 5.0
+
+# Process-wide token cache keyed by (access_token_url, client_id, scope).
+# Values are (access_token, expires_at) with expires_at on the monotonic
+# clock, so every ActigraphOAuth2 instance with the same credentials shares
+# one token instead of hitting the auth server per pipeline run. Kept at
+# module level - @configspec freezes class-level mutable defaults.
+_TOKEN_CACHE: dict = {}
+_TOKEN_CACHE_LOCK = threading.Lock()
+
+# Module-level session for the token endpoint so TCP/TLS connections are
+# pooled across ActigraphOAuth2 instances instead of being rebuilt (and
+# re-handshaken) on every actigraph_auth() call.
+_SESSION = Session()
+_SESSION.headers["Connection"] = "keep-alive"
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=32,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            # urllib3 does not retry POST by default; the client-credentials
+            # token fetch is idempotent, so opting it in is safe
+            allowed_methods=frozenset({"POST"}),
+        ),
+    ),
+)
 
 
 @configspec
 class ActigraphOAuth2(AuthConfigBase, AuthBase):
     """Custom OAuth2 authentication for Actigraph CentrePoint API."""
-    
+
     access_token_url: str = None
     client_id: TSecretStrValue = None
     client_secret: TSecretStrValue = None
     scope: str = None
-    
+
     def __init__(
         self,
         access_token_url: str = None,
@@ -37,48 +76,90 @@ class ActigraphOAuth2(AuthConfigBase, AuthBase):
         self.client_secret = client_secret or self.client_secret
         self.scope = scope or self.scope
         self.access_token: str = None
-        self.session = Session()
-    
+        self.session = _SESSION
+
+    def _cache_key(self) -> tuple:
+        return (self.access_token_url, str(self.client_id), self.scope)
+
     def obtain_token(self) -> str:
-        """Obtain OAuth2 access token from the auth server."""
+        """Obtain OAuth2 access token, reusing a cached one until it expires."""
+        key = self._cache_key()
+        with _TOKEN_CACHE_LOCK:
+            cached = _TOKEN_CACHE.get(key)
+            if cached and time.monotonic() < cached[1] - _TOKEN_EXPIRY_LEEWAY:
+                self.access_token = cached[0]
+                return self.access_token
+
         data = {
             "grant_type": "client_credentials",
             "client_id": str(self.client_id),
             "client_secret": str(self.client_secret),
             "scope": self.scope,
         }
-        
+
         headers = {
             "Content-Type": "application/x-www-form-urlencoded"
         }
-        
+
+        # Time out rather than hang the pipeline on a stuck TCP connection,
+        # and release the response back to the pool as soon as it is parsed
         response = self.session.post(
             self.access_token_url,
             data=data,
-            headers=headers
+            headers=headers,
+            timeout=10,
         )
-        response.raise_for_status()
-        
-        token_data = response.json()
+        try:
+            response.raise_for_status()
+            token_data = orjson.loads(response.content)
+        finally:
+            response.close()
         self.access_token = token_data["access_token"]
+        expires_at = time.monotonic() + int(token_data.get("expires_in", 3600))
+        with _TOKEN_CACHE_LOCK:
+            _TOKEN_CACHE[key] = (self.access_token, expires_at)
         return self.access_token
-    
+
     def __call__(self, request: PreparedRequest) -> PreparedRequest:
         """Add authorization header to the request."""
-        if not self.access_token:
-            self.obtain_token()
-        
+        # Always go through obtain_token so an expired token is refreshed
+        # transparently; the cache makes this free while the token is valid.
+        self.obtain_token()
+
         request.headers["Authorization"] = f"Bearer {self.access_token}"
         return request
 
 
+@lru_cache(maxsize=8)
+def get_pipeline(pipeline_name: str, destination: str, dataset_name: str):
+    """
+    Create a DLT pipeline, caching it by (pipeline_name, destination, dataset_name).
+
+    dlt.pipeline() re-reads the working directory, config providers and
+    incremental state on every call; for schedulers that invoke the same
+    pipeline repeatedly in one process this caches that setup cost.
+
+    Returns:
+        dlt.Pipeline: The cached (or newly created) pipeline object
+    """
+    return dlt.pipeline(
+        pipeline_name=pipeline_name,
+        destination=destination,
+        dataset_name=dataset_name,
+    )
+
+
+@lru_cache(maxsize=1)
 def actigraph_auth() -> ActigraphOAuth2:
     """
     Creates and returns an OAuth2 authentication object for Actigraph API.
-    
+
     This function retrieves credentials from environment variables and configures OAuth2 client
     credentials flow with the appropriate scope for CentrePoint API access.
-    
+
+    The auth object is cached, so pipelines that build many sources (e.g. one
+    per subject) share a single instance with its session and token.
+
     Returns:
         ActigraphOAuth2: Configured authentication object
     """
@@ -91,6 +172,78 @@ def actigraph_auth() -> ActigraphOAuth2:
     )
 
 
+def _build_rest_config(
+    study_id: int,
+    subject_id: int,
+    from_date: str,
+    to_date: str,
+    daily_statistics_setting_id: str = None,
+    refresh: bool = False,
+) -> dict:
+    """
+    Build the rest_api_source config dict for one study/subject pair.
+
+    Factored out of actigraph_source so multi-subject pipelines can build
+    many configs while sharing the cached auth object (and with it the
+    session pool and token cache) across all of them.
+    """
+    # Build query parameters - the date window is bound to the incremental
+    # cursor below, so only the optional setting id is static
+    params = {}
+
+    if daily_statistics_setting_id:
+        params["dailyStatisticsSettingId"] = daily_statistics_setting_id
+
+    # Build endpoint config - conditionally include incremental based on refresh flag
+    endpoint_config = {
+        "path": f"analytics/v3/Studies/{study_id}/Subjects/{subject_id}/DailyStatistics",
+        "data_selector": "items",
+    }
+
+    if refresh:
+        # Refresh mode: no incremental state, query the full configured range
+        params["fromDate"] = from_date
+        params["toDate"] = to_date
+    else:
+        # Bind the cursor to the fromDate query parameter so the API only
+        # returns rows newer than the stored watermark instead of the full
+        # [from_date, to_date] range being refetched and filtered client-side
+        endpoint_config["incremental"] = {
+            "cursor_path": "lastEpochDateTimeUtc",
+            "initial_value": from_date,
+            "start_param": "fromDate",
+            "end_param": "toDate",
+            "end_value": to_date,
+            # The API returns daily statistics oldest-first; declaring the
+            # order lets DLT stop paging once the cursor passes end_value
+            "row_order": "asc",
+        }
+
+    return {
+        "client": {
+            "base_url": "https://api.actigraphcorp.com/",
+            "auth": actigraph_auth(),
+        },
+        "resource_defaults": {
+            # No primary key - we're just storing raw data
+            "write_disposition": "append",  # Just `append` raw data, no merge/dedup
+            "endpoint": {
+                "params": params,
+            }
+        },
+        "resources": [
+            {
+                "name": "daily_statistics",
+                "endpoint": endpoint_config,
+                "max_table_nesting": 0,  # Keep all nested data in main table
+                # Run page fetching in DLT's extract worker pool so network
+                # round-trips overlap with normalization downstream
+                "parallelized": True,
+            }
+        ],
+    }
+
+
 @dlt.source(name="actigraph")
 def actigraph_source(
     study_id: int = dlt.config.value,
@@ -124,49 +277,15 @@ def actigraph_source(
         DLT resources containing daily statistics data
     """
     
-    # Build query parameters
-    params = {
-        "fromDate": from_date,
-        "toDate": to_date,
-    }
-    
-    if daily_statistics_setting_id:
-        params["dailyStatisticsSettingId"] = daily_statistics_setting_id
-    
     # Configure the REST API source
-    # Build endpoint config - conditionally include incremental based on refresh flag
-    endpoint_config = {
-        "path": f"analytics/v3/Studies/{study_id}/Subjects/{subject_id}/DailyStatistics",
-        "data_selector": "items",
-    }
-    
-    # Add incremental loading unless refresh mode is enabled
-    if not refresh:
-        endpoint_config["incremental"] = {
-            "cursor_path": "lastEpochDateTimeUtc",
-            "initial_value": "1970-01-01T00:00:00Z",  # ISO datetime string to match API data type
-        }
-    
-    config = {
-        "client": {
-            "base_url": "https://api.actigraphcorp.com/",
-            "auth": actigraph_auth(),
-        },
-        "resource_defaults": {
-            # No primary key - we're just storing raw data
-            "write_disposition": "append",  # Just `append` raw data, no merge/dedup
-            "endpoint": {
-                "params": params,
-            }
-        },
-        "resources": [
-            {
-                "name": "daily_statistics",
-                "endpoint": endpoint_config,
-                "max_table_nesting": 0,  # Keep all nested data in main table
-            }
-        ],
-    }
+    config = _build_rest_config(
+        study_id=study_id,
+        subject_id=subject_id,
+        from_date=from_date,
+        to_date=to_date,
+        daily_statistics_setting_id=daily_statistics_setting_id,
+        refresh=refresh,
+    )
     
     # Get the REST API source
     source = rest_api_source(config)
@@ -200,14 +319,11 @@ def load_daily_statistics(
     Returns:
         None
     """
-    # Create pipeline
-    pipeline = dlt.pipeline(
-        pipeline_name="actigraph_pipeline",
-        destination=destination,
-        dataset_name=dataset_name,
-    )
+    # Create (or reuse) the pipeline
+    pipeline = get_pipeline("actigraph_pipeline", destination, dataset_name)
     
     # Run the pipeline
+    # Parquet intermediate files: fewer bytes to S3 and faster Athena loads
     load_info = pipeline.run(
         actigraph_source(
             study_id=study_id,
@@ -215,7 +331,8 @@ def load_daily_statistics(
             from_date=from_date,
             to_date=to_date,
             daily_statistics_setting_id=daily_statistics_setting_id,
-        )
+        ),
+        loader_file_format="parquet",
     )
     
     print(load_info)
@@ -5,8 +5,7 @@ This script demonstrates a minimal setup for loading data from the Actigraph API
 """
 
 import os
-import dlt
-from actigraph_source import actigraph_source
+from actigraph_source import actigraph_source, get_pipeline
 
 
 def quick_start_example():
@@ -42,11 +41,11 @@ def quick_start_example():
     print(f"  Date Range: {FROM_DATE} to {TO_DATE}")
     print(f"  Destination: AWS Athena")
     
-    # Step 3: Create the DLT pipeline
-    pipeline = dlt.pipeline(
-        pipeline_name="actigraph_quickstart",
-        destination="athena",
-        dataset_name="actigraph_data",
+    # Step 3: Create the DLT pipeline (cached across invocations)
+    pipeline = get_pipeline(
+        "actigraph_quickstart",
+        "athena",
+        "actigraph_data",
     )
     
     # Step 4: Create the data source
@@ -61,7 +60,8 @@ def quick_start_example():
     # Step 5: Run the pipeline
     print("⚙️  Running data ingestion pipeline...")
     try:
-        load_info = pipeline.run(source)
+        # Parquet intermediate files: fewer bytes to S3 and faster Athena loads
+        load_info = pipeline.run(source, loader_file_format="parquet")
         
         # Step 6: Check results
         print("\n" + "="*60)
@@ -5,7 +5,7 @@ This pipeline loads daily statistics data from S3 JSONL files
 and loads them into Snowflake Iceberg tables.
 """
 
-import dlt
+from actigraph_source import get_pipeline
 from s3_actigraph_source import s3_actigraph_source
 
 
@@ -30,11 +30,11 @@ def load_daily_statistics():
     role = "YOUR_ROLE"
     """
     
-    # Create pipeline
-    pipeline = dlt.pipeline(
-        pipeline_name="s3_daily_statistics_to_snowflake",
-        destination="snowflake",
-        dataset_name="sensorcloud",
+    # Create (or reuse) the pipeline
+    pipeline = get_pipeline(
+        "s3_daily_statistics_to_snowflake",
+        "snowflake",
+        "sensorcloud",
     )
     
     # Load daily statistics data
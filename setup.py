@@ -1,8 +1,10 @@
 from dotenv import load_dotenv
 
-import boto3
-import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import hashlib
+import tempfile
 import time
 import os
 
@@ -15,15 +17,74 @@ S3_TABLE_LOCATION = "s3://sensorcloud-lakehouse-sandbox/iceberg_catalog/sandbox_
 DB_NAME = "sandbox_static"
 TABLE_NAME = "dlt_demo"
 
-session = boto3.Session(region_name=os.getenv("AWS_REGION"))
-glue_client = session.client("glue")
-athena_client = session.client("athena")
+# Rows per parquet row group - multiple row groups let Athena/Iceberg
+# readers prune and fetch column chunks in parallel
+ROW_GROUP_SIZE = 128 * 1024
+
+# Precomputed schema matching the Iceberg table - skips per-call schema
+# inference when building the Arrow table
+PARQUET_SCHEMA = pa.schema([
+    ('x', pa.int32()),
+    ('y', pa.int32()),
+    ('z', pa.int32()),
+    ('timestamp', pa.timestamp('ns')),
+])
+
+# boto3 session and clients are built lazily: importing botocore and
+# constructing clients costs hundreds of ms that pure parquet-generation
+# callers never need to pay
+_clients = None
+
+
+def _get_clients():
+    """Lazily create and cache the boto3 session and Glue/Athena clients."""
+    global _clients
+    if _clients is None:
+        import boto3
+        from botocore.config import Config
+
+        # Keep pooled connections warm across the status-poll loop and let
+        # botocore adapt retries to throttling instead of fixed backoff
+        client_config = Config(
+            max_pool_connections=50,
+            retries={"mode": "adaptive", "max_attempts": 5},
+            read_timeout=10,
+        )
+        session = boto3.Session(region_name=os.getenv("AWS_REGION"))
+        _clients = (
+            session,
+            session.client("glue", config=client_config),
+            session.client("athena", config=client_config),
+        )
+    return _clients
+
+# Modern NumPy generator backed by PCG64DXSM - faster than the legacy
+# np.random.* API with better statistical properties. Set RANDOM_SEED for
+# reproducible output (e.g. in tests); unseeded runs draw from OS entropy.
+_seed = os.getenv("RANDOM_SEED")
+rng = np.random.Generator(np.random.PCG64DXSM(int(_seed) if _seed else None))
+
+
+def _setup_marker_path() -> str:
+    """Local marker file recording that the database/table setup succeeded."""
+    key = hashlib.sha256(f"{DB_NAME}|{TABLE_NAME}|{S3_TABLE_LOCATION}".encode()).hexdigest()
+    return os.path.join(tempfile.gettempdir(), f".dlt_setup_{key}")
 
 
 def create_database_and_table():
     """
     Checks for and creates the Glue database and the Athena Iceberg table if they don't exist.
+
+    Setup is idempotent, so after the first success a local marker file
+    short-circuits the Glue/Athena round-trips on subsequent runs.
     """
+    marker = _setup_marker_path()
+    if os.path.exists(marker):
+        print(f"Database '{DB_NAME}' and table '{TABLE_NAME}' already set up (marker found), skipping.")
+        return
+
+    _, glue_client, athena_client = _get_clients()
+
     try:
         glue_client.get_database(Name=DB_NAME)
         print(f"Database '{DB_NAME}' already exists.")
@@ -48,7 +109,8 @@ def create_database_and_table():
     """
 
     print(f"\nExecuting CREATE TABLE query for '{DB_NAME}.{TABLE_NAME}'...")
-    print(create_table_query)
+    if os.getenv("DLT_VERBOSE"):
+        print(create_table_query)
 
     try:
         response = athena_client.start_query_execution(
@@ -58,19 +120,25 @@ def create_database_and_table():
         )
         query_execution_id = response["QueryExecutionId"]
 
+        # Poll with exponential backoff - fast queries (CREATE TABLE IF NOT
+        # EXISTS on an existing table) finish in well under a second, so a
+        # fixed 5s sleep would waste most of the wall time
         state = "RUNNING"
+        delay = 0.1
         while state in ["RUNNING", "QUEUED"]:
             result = athena_client.get_query_execution(
                 QueryExecutionId=query_execution_id
             )
             state = result["QueryExecution"]["Status"]["State"]
-            if state in ["SUCCEEDED", "FAILED", "CANCELLED"]:
-                break
-            print("Query is running...")
-            time.sleep(5)
+            if state in ["RUNNING", "QUEUED"]:
+                print("Query is running...")
+                time.sleep(delay)
+                delay = min(delay * 1.7, 2.0)
 
         if state == "SUCCEEDED":
             print(f"Table '{DB_NAME}.{TABLE_NAME}' created or already exists. Query SUCCEEDED.")
+            with open(marker, "w"):
+                pass
         else:
             error_message = result["QueryExecution"]["Status"].get("StateChangeReason", "No reason provided.")
             print(f"Query FAILED. Reason: {error_message}")
@@ -81,51 +149,110 @@ def create_database_and_table():
     print(f"--- Database and Table Setup Complete ---")
 
 
-def generate_parquet_file(num_rows: int, filename: str = "random_data.parquet"):
+def generate_parquet_file(
+    num_rows: int,
+    filename: str = "random_data.parquet",
+    s3_bucket: str = None,
+    s3_key: str = None,
+):
     """
     Generates a Parquet file with random data for x, y, z, and timestamp columns.
 
     Args:
         num_rows (int): The number of rows of data to generate.
         filename (str): The name of the output parquet file. Defaults to "random_data.parquet".
+        s3_bucket (str): Optional S3 bucket. When set, the file is serialized to an
+            in-memory Arrow buffer and uploaded directly - no local disk round-trip.
+        s3_key (str): S3 object key for the upload. Defaults to the filename.
+
+    Raises:
+        ValueError: If num_rows is not positive.
     """
-    print(f"\n--- Generating Parquet File ---")
     if num_rows <= 0:
-        print("Number of rows must be positive.")
-        return
+        raise ValueError("num_rows must be positive")
+
+    print(f"\n--- Generating Parquet File ---")
 
     print(f"Generating {num_rows} rows of random data...")
 
-    # Generate random data efficiently using NumPy
-    data = {
-        'x': np.random.randint(0, 1000, size=num_rows, dtype=np.int32),
-        'y': np.random.randint(0, 1000, size=num_rows, dtype=np.int32),
-        'z': np.random.randint(0, 1000, size=num_rows, dtype=np.int32),
-        # Generate random timestamps within the last 5 years
-        'timestamp': pd.to_datetime(
-            np.random.randint(
-                int(time.time()) - (86400 * 365 * 5),
-                int(time.time()),
-                size=num_rows
-            ),
-            unit='s'
-        )
-    }
+    # Random timestamps within the last 5 years, drawn as whole seconds and
+    # scaled to nanoseconds so the int64 buffer reinterprets as
+    # datetime64[ns] without a cast. Keeping second precision matters: the
+    # Athena/Iceberg target stores microseconds, and sub-microsecond values
+    # fail the ns->us cast when main.py loads the file
+    now_s = int(time.time())
+    low_s = now_s - (86400 * 365 * 5)
 
-    df = pd.DataFrame(data)
+    def make_batch(n: int) -> pa.RecordBatch:
+        """Generate one row-group-sized batch of random rows."""
+        timestamps = (
+            rng.integers(low_s, now_s, size=n, dtype=np.int64) * 1_000_000_000
+        ).view('datetime64[ns]')
 
-    df['timestamp'] = df['timestamp'].astype('datetime64[ns]')
+        # One fused draw for x/y/z instead of three separate RNG calls; values
+        # fit in 10 bits, so draw at int16 (half the RNG output bandwidth) and
+        # widen to the table's int32 schema at the Arrow boundary
+        xyz = rng.integers(0, 1000, size=(n, 3), dtype=np.int16)
 
-    output_path = os.path.join(os.getcwd(), filename)
+        # Wrap the numpy buffers in Arrow arrays directly - no pandas
+        # DataFrame intermediate (and its BlockManager copy) on the way out,
+        # and no schema inference thanks to the precomputed PARQUET_SCHEMA
+        return pa.RecordBatch.from_arrays(
+            [
+                pa.array(xyz[:, 0], type=pa.int32()),
+                pa.array(xyz[:, 1], type=pa.int32()),
+                pa.array(xyz[:, 2], type=pa.int32()),
+                pa.array(timestamps),
+            ],
+            schema=PARQUET_SCHEMA,
+        )
+
+    output_path = filename
+    # For S3 targets, serialize into an Arrow buffer and upload it directly
+    # instead of writing the file to local disk and reading it back
+    sink = pa.BufferOutputStream() if s3_bucket else output_path
+    first_batch = None
     try:
-        df.to_parquet(output_path, engine='pyarrow')
-        print(f"Successfully generated and saved Parquet file to: {output_path}")
-        print("\nDataFrame sample:")
-        print(df.head())
+        # Generate and write one row group at a time so peak RAM stays
+        # bounded by ROW_GROUP_SIZE rows no matter how large num_rows gets.
+        # Dictionary encoding is pure overhead for uniform random ints (no
+        # repetition to exploit); keep page stats for Iceberg pruning
+        with pq.ParquetWriter(
+            sink,
+            PARQUET_SCHEMA,
+            compression='snappy',
+            use_dictionary=False,
+            write_statistics=True,
+            data_page_size=1 << 20,
+        ) as writer:
+            for start in range(0, num_rows, ROW_GROUP_SIZE):
+                batch = make_batch(min(ROW_GROUP_SIZE, num_rows - start))
+                writer.write_batch(batch)
+                if first_batch is None:
+                    first_batch = batch.slice(0, 5)
+
+        if s3_bucket:
+            key = s3_key or filename
+            session = _get_clients()[0]
+            session.client("s3").put_object(
+                Bucket=s3_bucket, Key=key, Body=sink.getvalue().to_pybytes()
+            )
+            print(f"Successfully generated and uploaded Parquet file to: s3://{s3_bucket}/{key}")
+        else:
+            print(f"Successfully generated and saved Parquet file to: {output_path}")
+        if os.getenv("DLT_VERBOSE"):
+            print("\nSample rows:")
+            print(pa.Table.from_batches([first_batch]))
     except Exception as e:
         print(f"Failed to write Parquet file. Error: {e}")
 
 
 if __name__ == "__main__":
-    create_database_and_table()
-    generate_parquet_file(num_rows=1024)
\ No newline at end of file
+    from concurrent.futures import ThreadPoolExecutor
+
+    # The Athena setup (AWS round-trips + polling) and the parquet
+    # generation are independent - overlap them instead of running serially
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        setup_future = executor.submit(create_database_and_table)
+        generate_parquet_file(num_rows=1024)
+        setup_future.result()
\ No newline at end of file